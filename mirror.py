@@ -9,23 +9,97 @@ before each run.
 from __future__ import annotations
 
 import argparse
+import asyncio
+import ctypes
 import hashlib
+import html
+import http.client
+import json
+import mmap
 import os
 import platform
 import re
 import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Iterable, Iterator, List, Tuple
 from urllib.error import URLError
-from urllib.parse import urlsplit
-from urllib.request import urlopen
+from urllib.parse import unquote_to_bytes, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass, urlopen
 
 
 DEFAULT_URL = "https://blog.example.com/"
 DEFAULT_OUTPUT_DIR = "site"
 REJECT_REGEX = r"/(admin|login|register|action|feed|cdn-cgi)/|/sitemap\.xml$"
+# Invariant wget options; commands only add paths, cookies and the target.
+# The link, naming and reject rules are shared by the recursive and worker
+# runs: local_path_for_url relies on both saving files the same way.
+_WGET_COMMON_FLAGS: Tuple[str, ...] = (
+    "--convert-links",
+    "--adjust-extension",
+    "--restrict-file-names=windows",
+    f"--reject-regex={REJECT_REGEX}",
+)
+_WGET_BASE_FLAGS: Tuple[str, ...] = (
+    "--mirror",
+    "--page-requisites",
+    "--no-parent",
+    *_WGET_COMMON_FLAGS,
+)
+_WGET_WORKER_FLAGS: Tuple[str, ...] = (
+    "--timestamping",
+    "--force-directories",
+    *_WGET_COMMON_FLAGS,
+)
+REWRITE_MANIFEST_SUFFIX = ".rewrite_manifest.json"
+REWRITE_SUFFIXES = frozenset({"html", "htm", "css", "js"})
+HTML_SUFFIXES = frozenset({"html", "htm"})
+WGET_REQUEST_PATTERN = re.compile(
+    r"^--\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}--\s+(?P<url>\S+)"
+)
+WGET_STATUS_PATTERN = re.compile(r"\.\.\. (?P<status>[1-5]\d\d)(?: |$)")
+WGET_TYPE_PATTERN = re.compile(r"\s\[(?P<type>[\w.+-]+/[\w.+-]+)\]$")
+HTML_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+IMG_PATTERN = re.compile(
+    rb'(<img[^>]+src=["\'])(?P<src>https?://[^"\']+)(["\'])', re.IGNORECASE
+)
+LINK_PATH_PATTERN = re.compile(rb"/[^\s\"'>)]*")
+# Link-bearing attributes and CSS references, for files wget did not convert.
+REFERENCE_PATTERN = re.compile(
+    rb"""\b(?:href|src)\s*=\s*"""
+    rb"""(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<uq>[^\s"'>]+))"""
+    rb"""|@import\s+(?:"(?P<idq>[^"]*)"|'(?P<isq>[^']*)')"""
+    rb"""|url\(\s*(?:"(?P<udq>[^"]*)"|'(?P<usq>[^']*)'|(?P<bare>[^)"'\s]*))\s*\)""",
+    re.IGNORECASE,
+)
+# Bytes wget --restrict-file-names=windows escapes as %XX in file names.
+WINDOWS_RESTRICTED_BYTES = re.compile(rb'[\x00-\x1f\x7f\\|/:?"*<>]')
+# How wget --convert-links quotes local file names in links, and the extra
+# entity quoting it applies inside HTML.
+LOCAL_LINK_QUOTES = str.maketrans({"%": "%25", "#": "%23", "?": "%3F"})
+HTML_LINK_QUOTES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", " ": "&#32;"}
+)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+DEFAULT_WGET_WORKERS = 2
+PROCESS_LINE_LIMIT = 1024 * 1024
+FINISHED_QUEUE_SIZE = 256
+FINISHED_WORKERS = 4
+DOWNLOAD_WORKERS = 32
+DOWNLOAD_CONNECTIONS_PER_HOST = 8
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_HEADERS = {
+    "User-Agent": f"Python-urllib/{sys.version_info[0]}.{sys.version_info[1]}",
+    "Accept-Encoding": "identity",
+}
+DOWNLOAD_PROXIES = getproxies()
 
 
 def project_root() -> Path:
@@ -78,22 +152,95 @@ def find_wget(root: Path) -> Path:
     )
 
 
+def session_directory(temp_dir: Path) -> Path:
+    """Directory for scratch files shared between the spider and mirror runs."""
+    return temp_dir.parent / ".wget_session"
+
+
+def find_aria2c() -> Path:
+    """Locate aria2c on PATH."""
+    aria2_path = shutil.which("aria2c")
+    if not aria2_path:
+        raise FileNotFoundError(
+            "aria2c not found. Install aria2 or use --downloader=wget."
+        )
+    return Path(aria2_path)
+
+
+def external_cache_dir() -> Path:
+    """Per-user cache for external images that outlives --clean runs."""
+    system_name = platform.system().lower()
+    if system_name == "windows":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+        return base / "typecho_mirror" / "Cache" / "external"
+    if system_name == "darwin":
+        return Path.home() / "Library" / "Caches" / "typecho_mirror" / "external"
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "typecho_mirror" / "external"
+
+
 def cleanup_directory(path: Path) -> None:
     """Remove a directory tree if it exists."""
     if path.exists():
         shutil.rmtree(path)
 
 
+def _clone_tree(src: Path, dst: Path) -> bool:
+    """Copy src to dst with copy-on-write reflinks where the filesystem allows.
+
+    Hardlinks are not an option here: wget and the post-processing steps
+    truncate and rewrite files in place, which would modify the seed too.
+    """
+    if platform.system().lower() != "linux" or not shutil.which("cp"):
+        return False
+    result = subprocess.run(
+        ["cp", "-a", "--reflink=auto", str(src), str(dst)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    if result.returncode != 0:
+        cleanup_directory(dst)
+        return False
+    return True
+
+
 def prepare_temp_directory(temp_dir: Path, seed_from: Path | None) -> None:
     """Create a fresh temporary directory, optionally seeded from an existing tree."""
     cleanup_directory(temp_dir)
     temp_dir.parent.mkdir(parents=True, exist_ok=True)
     if seed_from and seed_from.exists():
-        shutil.copytree(seed_from, temp_dir)
+        if not _clone_tree(seed_from, temp_dir):
+            shutil.copytree(seed_from, temp_dir)
     else:
         temp_dir.mkdir(parents=True, exist_ok=True)
 
 
+def _exchange_paths(src: Path, dst: Path) -> bool:
+    """Atomically swap two existing paths with renameat2(RENAME_EXCHANGE).
+
+    Only available on Linux with glibc 2.28+ and a filesystem that supports
+    the flag; returns False whenever the swap did not happen.
+    """
+    if sys.platform != "linux":
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    renameat2.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    renameat2.restype = ctypes.c_int
+    result = renameat2(
+        AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dst), RENAME_EXCHANGE
+    )
+    return result == 0
+
+
 def replace_directory(src: Path, dst: Path) -> None:
     """Replace dst with src, keeping the previous dst until replacement succeeds."""
     backup = dst.with_name(f"{dst.name}_backup")
@@ -102,6 +249,11 @@ def replace_directory(src: Path, dst: Path) -> None:
 
     dst.parent.mkdir(parents=True, exist_ok=True)
     dst_existed = dst.exists()
+    if dst_existed and _exchange_paths(src, dst):
+        # src now holds the previous output.
+        shutil.rmtree(src, ignore_errors=True)
+        return
+
     if dst_existed:
         dst.rename(backup)
 
@@ -116,150 +268,964 @@ def replace_directory(src: Path, dst: Path) -> None:
         shutil.rmtree(backup)
 
 
+@lru_cache(maxsize=None)
+def wget_version(wget_path: Path) -> str:
+    """Return the first line of `wget --version`, checking the binary runs."""
+    result = subprocess.run(
+        [str(wget_path), "--version"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    if result.returncode != 0 or not result.stdout:
+        raise OSError(f"{wget_path} --version exited with code {result.returncode}")
+    return result.stdout.splitlines()[0].strip()
+
+
+def session_cookie_args(session_dir: Path | None, save: bool) -> List[str]:
+    """wget options that carry cookies from the spider run into the mirror run."""
+    if session_dir is None:
+        return []
+    cookies = session_dir / "cookies.txt"
+    args = ["--keep-session-cookies"]
+    if cookies.exists():
+        args.append(f"--load-cookies={cookies}")
+    if save:
+        args.append(f"--save-cookies={cookies}")
+    return args
+
+
 def build_wget_command(
-    wget_path: Path, output_dir: Path, url: str, spider: bool
+    wget_path: Path,
+    output_dir: Path,
+    url: str,
+    spider: bool,
+    session_dir: Path | None = None,
 ) -> List[str]:
     """Construct the wget command for the mirror job."""
-    command: List[str] = [
+    return [
         str(wget_path),
-        "--mirror",
-        "--convert-links",
-        "--adjust-extension",
-        "--page-requisites",
-        "--no-parent",
-        "--restrict-file-names=windows",
-        f"--reject-regex={REJECT_REGEX}",
+        *_WGET_BASE_FLAGS,
         "-P",
         str(output_dir),
         "-nH",
+        *session_cookie_args(session_dir, save=True),
+        *(("--spider",) if spider else ()),
+        url,
     ]
-    if spider:
-        command.append("--spider")
-    command.append(url)
+
+
+def build_wget_worker_command(
+    wget_path: Path,
+    output_dir: Path,
+    input_file: Path,
+    session_dir: Path | None = None,
+) -> List[str]:
+    """Construct a non-recursive wget command for one partition of spidered URLs."""
+    # Workers only read the shared cookie jar; concurrent saves would race.
+    return [
+        str(wget_path),
+        *_WGET_WORKER_FLAGS,
+        "-P",
+        str(output_dir),
+        "-nH",
+        *session_cookie_args(session_dir, save=False),
+        "-i",
+        str(input_file),
+    ]
+
+
+def build_aria2_command(
+    aria2_path: Path,
+    output_dir: Path,
+    input_file: Path,
+    session_dir: Path | None = None,
+) -> List[str]:
+    """Construct the aria2c command that downloads the spidered URL list."""
+    command = [
+        str(aria2_path),
+        f"--input-file={input_file}",
+        f"--dir={output_dir}",
+        "-x",
+        "8",
+        "-j",
+        "16",
+        "-s",
+        "8",
+        "--max-connection-per-server=8",
+        "--allow-overwrite=true",
+        "--auto-file-renaming=false",
+        "--console-log-level=warn",
+        "--summary-interval=0",
+    ]
+    cookies = session_dir / "cookies.txt" if session_dir else None
+    if cookies and cookies.exists():
+        command.append(f"--load-cookies={cookies}")
     return command
 
 
-def stream_process_output(command: Iterable[str]) -> int:
-    """Run a process and stream stdout/stderr to the console."""
-    with subprocess.Popen(
-        list(command),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-    ) as proc:
-        if proc.stdout:
-            for line in proc.stdout:
-                print(line, end="")
-        return_code = proc.wait()
+def spider_urls(log_path: Path, base_url: str) -> dict[str, str | None]:
+    """Extract the unique base-host URLs wget requested from a spider log.
+
+    Returns url -> content type, as reported on wget's "Length:" line, or
+    None when the log does not show one.
+    """
+    host = urlsplit(base_url).netloc
+    urls: dict[str, str | None] = {}
+    current: str | None = None
+    status = ""
+    is_robots = False
+    # wget saves a redirect target under the redirecting URL's name, so
+    # those URLs take the content type of the request that follows them.
+    redirects: list[str] = []
+    with open(log_path, encoding="utf-8", errors="replace") as log:
+        for line in log:
+            match = WGET_REQUEST_PATTERN.match(line)
+            if match:
+                url = match.group("url")
+                if url != current:
+                    if current and status.startswith("3"):
+                        redirects.append(current)
+                    else:
+                        redirects = []
+                current = url
+                status = ""
+                parsed = urlsplit(url)
+                is_robots = parsed.netloc == host and parsed.path == "/robots.txt"
+                if parsed.netloc == host and not is_robots:
+                    urls.setdefault(url, None)
+                continue
+            if current is None:
+                continue
+            status_match = WGET_STATUS_PATTERN.search(line)
+            if status_match:
+                status = status_match.group("status")
+                # wget requests robots.txt itself; --mirror keeps it when served.
+                if is_robots and status.startswith("2"):
+                    urls.setdefault(current, None)
+                continue
+            type_match = WGET_TYPE_PATTERN.search(line)
+            if type_match:
+                content_type = type_match.group("type").lower()
+                for url in (current, *redirects):
+                    if url in urls and urls[url] is None:
+                        urls[url] = content_type
+                redirects = []
+    return urls
+
+
+def partition_urls(urls: Iterable[str], workers: int) -> List[List[str]]:
+    """Split urls into stable buckets keyed by a hash of the URL path."""
+    buckets: List[List[str]] = [[] for _ in range(workers)]
+    for url in urls:
+        digest = hashlib.md5(urlsplit(url).path.encode("utf-8", "ignore")).hexdigest()
+        buckets[int(digest, 16) % workers].append(url)
+    return buckets
+
+
+def _wget_file_name(component: str) -> str:
+    """Decode %XX escapes, then re-escape the bytes wget keeps out of file names."""
+    raw = WINDOWS_RESTRICTED_BYTES.sub(
+        lambda match: b"%%%02X" % match.group()[0], unquote_to_bytes(component)
+    )
+    return os.fsdecode(raw)
+
+
+def local_path_for_url(url: str, content_type: str | None = None) -> str:
+    """Map a URL to the relative path wget -nH saves it under.
+
+    Follows --restrict-file-names=windows ("?" becomes "@", reserved bytes
+    are %XX-escaped) and, given the response content type, the .html/.css
+    suffixes --adjust-extension adds.
+    """
+    parsed = urlsplit(url)
+    segments = parsed.path.split("/")[1:] or [""]
+    if not segments[-1]:
+        segments[-1] = "index.html"
+    path = "/".join(_wget_file_name(segment) for segment in segments)
+    if parsed.query or url.partition("#")[0].endswith("?"):
+        path += "@" + _wget_file_name(parsed.query)
+    if content_type in HTML_CONTENT_TYPES:
+        if not path.lower().endswith((".html", ".htm")):
+            path += ".html"
+    elif content_type == "text/css" and not path.lower().endswith(".css"):
+        path += ".css"
+    return path
+
+
+def write_aria2_input(urls: dict[str, str | None], input_file: Path) -> None:
+    """Write an aria2c input file that preserves the mirror's directory layout.
+
+    urls maps each URL to its content type, as returned by spider_urls.
+    """
+    with open(input_file, "w", encoding="utf-8", errors="surrogateescape") as fh:
+        for url, content_type in urls.items():
+            fh.write(f"{url}\n  out={local_path_for_url(url, content_type)}\n")
+
+
+def stream_process_output(command: Iterable[str], tee_log: Path | None = None) -> int:
+    """Run a process with stdout/stderr on the console, optionally copied to tee_log."""
+    if tee_log is None:
+        # Nothing to capture, so the child writes straight to our stdout
+        # instead of every line passing through Python.
+        sys.stdout.flush()
+        return subprocess.run(list(command), stderr=subprocess.STDOUT).returncode
+
+    log = open(tee_log, "w", encoding="utf-8")
+    try:
+        with subprocess.Popen(
+            list(command),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        ) as proc:
+            if proc.stdout:
+                for line in proc.stdout:
+                    print(line, end="")
+                    log.write(line)
+            return_code = proc.wait()
+    finally:
+        log.close()
     return return_code
 
 
-def rewrite_links_to_local(output_dir: Path, base_url: str) -> None:
-    """Post-process downloaded files to point base-domain assets to local copies."""
-    parsed = urlsplit(base_url)
-    host = parsed.netloc
-    if not host:
-        return
-    prefixes = {f"{scheme}://{host}" for scheme in ("http", "https")}
-    prefixes.add(f"//{host}")
-    pattern = re.compile(
-        r"(?P<prefix>" + "|".join(re.escape(p) for p in prefixes) + r")(?P<path>/[^\s\"'>)]+)"
+async def _drain_output(
+    stream: asyncio.StreamReader,
+    prefix: str,
+    finished: asyncio.Queue[str | None] | None,
+) -> None:
+    # wget handles its -i list in order, so a new request line means the
+    # previous URL has been saved.
+    current: str | None = None
+    async for raw in stream:
+        line = raw.decode("utf-8", errors="replace")
+        print(prefix + line, end="")
+        if finished is None:
+            continue
+        match = WGET_REQUEST_PATTERN.match(line)
+        if match and match.group("url") != current:
+            if current:
+                await finished.put(current)
+            current = match.group("url")
+
+
+async def _consume_finished(
+    finished: asyncio.Queue[str | None], on_finished: Callable[[str], object]
+) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        url = await finished.get()
+        if url is None:
+            return
+        # A failing callback must not stop this consumer: the queue would
+        # fill up and block the output drains, stalling the wget workers.
+        try:
+            await loop.run_in_executor(None, on_finished, url)
+        except Exception as exc:
+            print(f"Post-processing {url} failed: {exc!r}", file=sys.stderr)
+
+
+async def _run_processes(
+    commands: List[List[str]], on_finished: Callable[[str], object] | None
+) -> List[int]:
+    finished: asyncio.Queue[str | None] | None = None
+    consumers: List[asyncio.Task[None]] = []
+    if on_finished is not None:
+        finished = asyncio.Queue(maxsize=FINISHED_QUEUE_SIZE)
+        consumers = [
+            asyncio.ensure_future(_consume_finished(finished, on_finished))
+            for _ in range(FINISHED_WORKERS)
+        ]
+    procs = [
+        await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=PROCESS_LINE_LIMIT,
+        )
+        for command in commands
+    ]
+    await asyncio.gather(
+        *(
+            _drain_output(proc.stdout, f"[{index}] ", finished)
+            for index, proc in enumerate(procs, start=1)
+            if proc.stdout
+        )
+    )
+    return_codes = [await proc.wait() for proc in procs]
+    if finished is not None:
+        for _ in consumers:
+            await finished.put(None)
+        await asyncio.gather(*consumers)
+    return return_codes
+
+
+def stream_process_outputs(
+    commands: Iterable[Iterable[str]],
+    on_finished: Callable[[str], object] | None = None,
+) -> int:
+    """Run processes concurrently, streaming prefixed output; return first failure.
+
+    on_finished is called from a worker thread with each URL wget has finished
+    with, so post-processing can start while the downloads are still running.
+    """
+    return_codes = asyncio.run(
+        _run_processes([list(c) for c in commands], on_finished)
     )
-    for file_path in output_dir.rglob("*"):
-        if file_path.suffix.lower() not in {".html", ".htm", ".css", ".js"}:
+    return next((code for code in return_codes if code != 0), 0)
+
+
+def _collect_files(output_dir: Path) -> tuple[list[str], list[str]]:
+    """Walk output_dir once, returning (link-rewrite targets, HTML files).
+
+    Paths are plain strings; large mirrors hold many entries and Path objects
+    are only built for the files that are actually processed.
+    """
+    rewrite_files: list[str] = []
+    html_files: list[str] = []
+    join = os.path.join
+    for dirpath, _dirnames, filenames in os.walk(output_dir):
+        for name in filenames:
+            dot = name.rfind(".")
+            if dot < 0:
+                continue
+            suffix = name[dot + 1 :].lower()
+            if suffix not in REWRITE_SUFFIXES:
+                continue
+            file_name = join(dirpath, name)
+            rewrite_files.append(file_name)
+            if suffix in HTML_SUFFIXES:
+                html_files.append(file_name)
+    return rewrite_files, html_files
+
+
+@contextmanager
+def _map_file(file_path: str | Path) -> Iterator[mmap.mmap | bytes]:
+    """Map a file read-only so regexes scan its bytes without a decoded copy."""
+    with open(file_path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _file_sha1(file_path: str | Path) -> str:
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rewrite_manifest_path(output_dir: Path) -> Path:
+    """Sidecar next to the output directory, so the manifest is never deployed."""
+    return output_dir.with_name(f".{output_dir.name}{REWRITE_MANIFEST_SUFFIX}")
+
+
+def load_rewrite_manifest(manifest_path: Path) -> dict[str, list]:
+    """Load path -> [size, mtime_ns, sha1] recorded by the previous run."""
+    try:
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _manifest_key(output_dir: Path, file_name: str) -> str:
+    return os.path.relpath(file_name, output_dir).replace(os.sep, "/")
+
+
+def _is_unchanged(file_name: str, entry: list | None) -> bool:
+    if not entry or len(entry) != 3:
+        return False
+    try:
+        stat = os.stat(file_name)
+        if stat.st_size != entry[0]:
+            return False
+        # Same size but touched (e.g. re-fetched by wget): compare contents.
+        return stat.st_mtime_ns == entry[1] or _file_sha1(file_name) == entry[2]
+    except OSError:
+        return False
+
+
+def filter_changed_files(
+    output_dir: Path, files: list[str], manifest: dict[str, list]
+) -> list[str]:
+    """Drop files that are byte-identical to what the previous run wrote."""
+    if not manifest:
+        return files
+    return [
+        p
+        for p in files
+        if not _is_unchanged(p, manifest.get(_manifest_key(output_dir, p)))
+    ]
+
+
+def build_rewrite_manifest(
+    output_dir: Path,
+    files: list[str],
+    previous: dict[str, list],
+    exclude: Iterable[str] = (),
+) -> dict[str, list]:
+    """Record the post-processed state of files so the next run can skip them."""
+    excluded = {_manifest_key(output_dir, p) for p in exclude}
+    manifest: dict[str, list] = {}
+    for file_name in files:
+        key = _manifest_key(output_dir, file_name)
+        if key in excluded:
             continue
         try:
-            original = file_path.read_text(encoding="utf-8", errors="ignore")
+            stat = os.stat(file_name)
+            entry = previous.get(key)
+            if not (
+                entry
+                and len(entry) == 3
+                and entry[0] == stat.st_size
+                and entry[1] == stat.st_mtime_ns
+            ):
+                entry = [stat.st_size, stat.st_mtime_ns, _file_sha1(file_name)]
         except OSError:
             continue
-        changed = False
+        manifest[key] = entry
+    return manifest
 
-        def _replace(match: re.Match[str]) -> str:
-            nonlocal changed
-            url_path = match.group("path")
-            local_target = (output_dir / url_path.lstrip("/")).resolve()
-            if local_target.exists():
-                relative = Path(
-                    os.path.relpath(local_target, start=file_path.parent.resolve())
-                )
-                changed = True
-                return str(relative).replace("\\", "/")
-            return match.group(0)
-
-        rewritten = pattern.sub(_replace, original)
-        if changed:
-            try:
-                file_path.write_text(rewritten, encoding="utf-8")
-            except OSError:
-                pass
+
+def write_rewrite_manifest(manifest_path: Path, manifest: dict[str, list]) -> None:
+    """Atomically write manifest; a failed write only costs the next run time."""
+    partial_path = manifest_path.with_name(manifest_path.name + ".part")
+    try:
+        with open(partial_path, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, sort_keys=True, separators=(",", ":"))
+        os.replace(partial_path, manifest_path)
+    except OSError:
+        try:
+            partial_path.unlink()
+        except OSError:
+            pass
+
+
+def _iter_host_links(
+    data: mmap.mmap | bytes, host: bytes
+) -> Iterator[tuple[int, int, bytes]]:
+    """Yield (start, end, path) for http://, https:// and //host links in data.
+
+    The host is located with a plain substring search, and only the path
+    following each hit is matched with an anchored regex.
+    """
+    needle = b"//" + host
+    find = data.find
+    match_path = LINK_PATH_PATTERN.match
+    pos = find(needle)
+    while pos >= 0:
+        path_start = pos + len(needle)
+        path_match = match_path(data, path_start)
+        if path_match is None:
+            pos = find(needle, path_start)
+            continue
+        start = pos
+        if pos >= 6 and data[pos - 6 : pos] == b"https:":
+            start = pos - 6
+        elif pos >= 5 and data[pos - 5 : pos] == b"http:":
+            start = pos - 5
+        yield start, path_match.end(), path_match.group()
+        pos = find(needle, path_match.end())
+
+
+def _saved_file_for_link(output_dir: Path, link: str) -> str | None:
+    """Find the file wget saved for a root-relative link, if it was downloaded."""
+    saved = os.path.join(output_dir, *local_path_for_url(link).split("/"))
+    # Without the content type, try the suffixes --adjust-extension may add.
+    for candidate in (saved, saved + ".html", saved + ".css"):
+        if os.path.isfile(candidate):
+            return candidate
+    # Directory URLs linked without their trailing slash.
+    index = os.path.join(saved, "index.html")
+    return index if os.path.isfile(index) else None
+
+
+def _splice(
+    data: mmap.mmap | bytes,
+    spans: Iterable[tuple[int, int, bytes]],
+    resolve: Callable[[bytes], bytes | None],
+) -> bytearray | None:
+    """Replace each (start, end, text) span that resolves; None if none did."""
+    rewritten = bytearray()
+    last = 0
+    changed = False
+    for start, end, text in spans:
+        replacement = resolve(text)
+        if replacement is None:
+            continue
+        rewritten += data[last:start]
+        rewritten += replacement
+        last = end
+        changed = True
+    if not changed:
+        return None
+    rewritten += data[last:]
+    return rewritten
+
+
+def _iter_references(data: mmap.mmap | bytes) -> Iterator[tuple[int, int, bytes]]:
+    """Yield (start, end, value) for href/src attributes and CSS url()/@import."""
+    for match in REFERENCE_PATTERN.finditer(data):
+        group = match.lastgroup
+        yield match.start(group), match.end(group), match.group(group)
 
 
+def _rewrite_one(
+    file_name: str, output_dir: Path, host: str, page_url: str | None = None
+) -> bool:
+    """Rewrite base-domain links in a single file; return True when it changed.
+
+    With page_url, root-relative and relative references in HTML and CSS are
+    resolved against it as well, for downloads that skipped --convert-links.
+    """
+    file_path = Path(file_name)
+    file_parent = file_path.parent.resolve()
+    suffix = os.path.splitext(file_name)[1][1:].lower()
+    in_html = suffix in HTML_SUFFIXES
+    host_bytes = host.encode("utf-8")
+    # Pages repeat the same links (nav, CSS, JS); resolve each path only once.
+    resolved_cache: dict[bytes, bytes | None] = {}
+    reference_cache: dict[bytes, bytes | None] = {}
+
+    def _link_text(link: bytes) -> str:
+        link_text = link.decode("utf-8", "ignore")
+        return html.unescape(link_text) if in_html else link_text
+
+    def _local_link(link: str) -> bytes | None:
+        local_target = _saved_file_for_link(output_dir, link)
+        if local_target is None:
+            return None
+        # Quote the way wget --convert-links does, so links written here
+        # match the ones wget converted itself.
+        local_link = (
+            os.path.relpath(os.path.realpath(local_target), start=file_parent)
+            .replace("\\", "/")
+            .translate(LOCAL_LINK_QUOTES)
+        )
+        if in_html:
+            local_link = local_link.translate(HTML_LINK_QUOTES)
+        return local_link.encode("utf-8", "surrogateescape")
+
+    def _resolve(url_path: bytes) -> bytes | None:
+        if url_path in resolved_cache:
+            return resolved_cache[url_path]
+        link, hash_mark, fragment = url_path.partition(b"#")
+        relative = _local_link(_link_text(link))
+        if relative is not None:
+            relative += hash_mark + fragment
+        resolved_cache[url_path] = relative
+        return relative
+
+    def _resolve_reference(value: bytes) -> bytes | None:
+        if value in reference_cache:
+            return reference_cache[value]
+        relative = None
+        link, hash_mark, fragment = value.partition(b"#")
+        link_text = _link_text(link).strip()
+        if link_text:
+            target = urlsplit(urljoin(page_url, link_text))
+            if target.scheme in ("http", "https") and target.netloc == host:
+                query = f"?{target.query}" if target.query else ""
+                relative = _local_link(target.path + query)
+        if relative is not None:
+            relative += hash_mark + fragment
+        reference_cache[value] = relative
+        return relative
+
+    try:
+        with _map_file(file_path) as data:
+            referenced = None
+            if page_url is not None and (in_html or suffix == "css"):
+                referenced = _splice(data, _iter_references(data), _resolve_reference)
+            source = data if referenced is None else referenced
+            rewritten = _splice(source, _iter_host_links(source, host_bytes), _resolve)
+            if rewritten is None:
+                rewritten = referenced
+    except (OSError, ValueError):
+        return False
+    if rewritten is None:
+        return False
+    try:
+        file_path.write_bytes(rewritten)
+    except OSError:
+        return False
+    return True
+
+
+def rewrite_links_to_local(
+    output_dir: Path,
+    base_url: str,
+    files: list[str],
+    page_urls: dict[str, str] | None = None,
+) -> None:
+    """Post-process downloaded files to point base-domain assets to local copies.
+
+    page_urls maps files to the URL they were downloaded from; their relative
+    links are rewritten too, which wget --convert-links otherwise does.
+    """
+    parsed = urlsplit(base_url)
+    host = parsed.netloc
+    if not host:
+        return
+    if not files:
+        return
+
+    # The per-file scanning and path work is CPU-bound, so spread it across cores.
+    # max_workers=None lets the executor apply the Windows 61-process limit.
+    with ProcessPoolExecutor(max_workers=None) as executor:
+        for _ in executor.map(
+            _rewrite_one,
+            files,
+            repeat(output_dir),
+            repeat(host),
+            [page_urls.get(p) for p in files] if page_urls else repeat(None),
+            chunksize=16,
+        ):
+            pass
+
+
+@lru_cache(maxsize=None)
 def _hash_filename(url: str, default_ext: str = ".bin") -> str:
     parsed = urlsplit(url)
     ext = Path(parsed.path).suffix or default_ext
-    digest = hashlib.sha1(url.encode("utf-8", "ignore")).hexdigest()
+    digest = hashlib.blake2b(url.encode("utf-8", "ignore"), digest_size=16).hexdigest()
     return f"{digest}{ext}"
 
 
-def download_external_images(output_dir: Path, base_url: str) -> None:
-    """Download external img/src assets and rewrite HTML to local relative paths."""
-    base_host = urlsplit(base_url).netloc
-    external_dir = output_dir / "external_assets"
-    external_dir.mkdir(parents=True, exist_ok=True)
+def _fetch_to_file(url: str, dest_path: Path) -> bool:
+    """Stream url into dest_path, removing partial output on failure."""
+    try:
+        with urlopen(url, timeout=20) as resp, open(dest_path, "wb") as out_f:
+            shutil.copyfileobj(resp, out_f, DOWNLOAD_CHUNK_SIZE)
+    except (URLError, OSError):
+        _remove_partial(dest_path)
+        return False
+    return True
+
 
-    img_pattern = re.compile(
-        r'(<img[^>]+src=["\'])(?P<src>https?:\/\/[^"\']+)(["\'])',
-        flags=re.IGNORECASE,
+def _remove_partial(dest_path: Path) -> None:
+    try:
+        dest_path.unlink()
+    except OSError:
+        pass
+
+
+def _fetch_pooled(
+    url: str,
+    dest_path: Path,
+    connections: dict[tuple[str, str], http.client.HTTPConnection],
+) -> bool:
+    """Fetch url over a kept-alive connection to its origin, reusing connections."""
+    parsed = urlsplit(url)
+    if parsed.scheme not in ("http", "https") or (
+        parsed.scheme in DOWNLOAD_PROXIES and not proxy_bypass(parsed.hostname or "")
+    ):
+        return _fetch_to_file(url, dest_path)
+
+    key = (parsed.scheme, parsed.netloc)
+    target = parsed.path or "/"
+    if parsed.query:
+        target += "?" + parsed.query
+    conn_class = (
+        http.client.HTTPSConnection
+        if parsed.scheme == "https"
+        else http.client.HTTPConnection
     )
-    replacements: dict[str, Path] = {}
-    html_files = [
-        p for p in output_dir.rglob("*") if p.suffix.lower() in {".html", ".htm"}
-    ]
+    while True:
+        conn = connections.get(key)
+        reused = conn is not None
+        try:
+            if conn is None:
+                # InvalidURL (e.g. a bad port) is raised here, not by request().
+                conn = connections[key] = conn_class(parsed.netloc, timeout=20)
+            conn.request("GET", target, headers=DOWNLOAD_HEADERS)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, OSError, ValueError):
+            if conn is not None:
+                conn.close()
+                connections.pop(key, None)
+            # A kept-alive connection may have been closed by the server;
+            # retry on a fresh one. Failures on fresh connections are final.
+            if reused:
+                continue
+            return False
+        break
+
+    try:
+        if 300 <= resp.status < 400:
+            # Let urllib follow redirects; they may point at another origin.
+            resp.read()
+            return _fetch_to_file(url, dest_path)
+        if resp.status != 200:
+            resp.read()
+            return False
+        with open(dest_path, "wb") as out_f:
+            shutil.copyfileobj(resp, out_f, DOWNLOAD_CHUNK_SIZE)
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        del connections[key]
+        _remove_partial(dest_path)
+        return False
+    return True
+
+
+def _fetch_batch(
+    items: list[tuple[str, Path]], slot: threading.Semaphore | None = None
+) -> list[bool]:
+    """Download items sequentially, sharing one connection per origin.
 
-    for file_path in html_files:
+    slot, when given, is held for the whole batch to cap connections per host.
+    """
+    connections: dict[tuple[str, str], http.client.HTTPConnection] = {}
+    with slot or nullcontext():
         try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
+            return [
+                _fetch_pooled(url, dest_path, connections) for url, dest_path in items
+            ]
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+
+def _link_or_copy(src: Path, dst: Path) -> bool:
+    try:
+        os.link(src, dst)
+    except OSError:
+        try:
+            shutil.copy2(src, dst)
         except OSError:
-            continue
+            return False
+    return True
 
-        changed = False
 
-        def _handle_match(match: re.Match[str]) -> str:
-            nonlocal changed
-            src_url = match.group("src")
-            host = urlsplit(src_url).netloc
-            if not host or host == base_host:
-                return match.group(0)
-
-            if src_url not in replacements:
-                filename = _hash_filename(src_url, default_ext=".img")
-                dest_path = external_dir / filename
-                if not dest_path.exists():
-                    try:
-                        with urlopen(src_url, timeout=20) as resp, open(
-                            dest_path, "wb"
-                        ) as out_f:
-                            shutil.copyfileobj(resp, out_f)
-                    except (URLError, OSError):
-                        return match.group(0)
-                replacements[src_url] = dest_path
-
-            dest_path = replacements[src_url]
-            relative = Path(
-                os.path.relpath(dest_path.resolve(), start=file_path.parent.resolve())
+def fetch_external_files(
+    urls: Iterable[str],
+    external_dir: Path,
+    cache_dir: Path | None = None,
+    executor: ThreadPoolExecutor | None = None,
+    host_slots: dict[str, threading.Semaphore] | None = None,
+) -> dict[str, Path]:
+    """Download urls concurrently into external_dir, returning url -> local path.
+
+    With cache_dir, files are fetched into the cache (via a .part file) and
+    hardlinked into external_dir, so later runs skip the network entirely.
+    Concurrent callers pass a shared executor and host_slots so that together
+    they stay within DOWNLOAD_CONNECTIONS_PER_HOST connections per host.
+    """
+    fetched: dict[str, Path] = {}
+    by_host: dict[str, list[tuple[str, Path]]] = {}
+    for url in urls:
+        filename = _hash_filename(url, default_ext=".img")
+        dest_path = external_dir / filename
+        if dest_path.exists():
+            fetched[url] = dest_path
+            continue
+        if cache_dir is None:
+            target = dest_path
+        else:
+            cache_path = cache_dir / filename
+            if cache_path.exists() and _link_or_copy(cache_path, dest_path):
+                fetched[url] = dest_path
+                continue
+            target = cache_path.with_name(f"{filename}.part")
+        by_host.setdefault(urlsplit(url).netloc, []).append((url, target))
+    if not by_host:
+        return fetched
+
+    # Each batch keeps one connection per origin alive, so images on the same
+    # CDN share a handful of TCP/TLS handshakes instead of one per image.
+    batches: list[list[tuple[str, Path]]] = []
+    slots: list[threading.Semaphore | None] = []
+    for host, items in by_host.items():
+        connections = min(DOWNLOAD_CONNECTIONS_PER_HOST, len(items))
+        batches.extend(items[offset::connections] for offset in range(connections))
+        slot = None
+        if host_slots is not None:
+            slot = host_slots.setdefault(
+                host, threading.BoundedSemaphore(DOWNLOAD_CONNECTIONS_PER_HOST)
             )
-            changed = True
-            new_src = str(relative).replace("\\", "/")
-            return f"{match.group(1)}{new_src}{match.group(3)}"
+        slots.extend(repeat(slot, connections))
+    workers = min(DOWNLOAD_WORKERS, len(batches))
+    with nullcontext(executor) if executor else ThreadPoolExecutor(workers) as pool:
+        for batch, results in zip(batches, pool.map(_fetch_batch, batches, slots)):
+            for (url, target), ok in zip(batch, results):
+                if not ok:
+                    continue
+                dest_path = external_dir / _hash_filename(url, default_ext=".img")
+                if cache_dir is not None:
+                    try:
+                        cache_path = cache_dir / dest_path.name
+                        os.replace(target, cache_path)
+                    except OSError:
+                        _remove_partial(target)
+                        continue
+                    if not _link_or_copy(cache_path, dest_path):
+                        continue
+                fetched[url] = dest_path
+    return fetched
+
 
-        rewritten = img_pattern.sub(_handle_match, content)
+def _scan_external_images(
+    html_files: Iterable[str], base_host: str
+) -> tuple[list[str], dict[bytes, str]]:
+    """Return the pages with external img srcs and a raw src -> URL mapping."""
+    pages: list[str] = []
+    external_urls: dict[bytes, str] = {}
+    same_host_prefixes = tuple(
+        f"{scheme}://{base_host}/".encode("utf-8") for scheme in ("http", "https")
+    )
+    finditer = IMG_PATTERN.finditer
+    for file_name in html_files:
+        found = False
+        try:
+            with _map_file(file_name) as data:
+                for match in finditer(data):
+                    src = match.group("src")
+                    if src in external_urls:
+                        found = True
+                        continue
+                    # Base-host images are the common case; skip them without
+                    # decoding or parsing the URL.
+                    if src.startswith(same_host_prefixes):
+                        continue
+                    src_url = src.decode("utf-8", "ignore")
+                    host = urlsplit(src_url).netloc
+                    if host and host != base_host:
+                        external_urls[src] = src_url
+                        found = True
+        except (OSError, ValueError):
+            continue
+        if found:
+            pages.append(file_name)
+    return pages, external_urls
+
+
+def _saved_html_file(output_dir: Path, url: str) -> str | None:
+    """Guess where wget -nH -E saved url, returning it only if it is HTML."""
+    relative = local_path_for_url(url, "text/html")
+    file_name = os.path.join(output_dir, *relative.split("/"))
+    return file_name if os.path.isfile(file_name) else None
+
+
+@contextmanager
+def external_image_prefetcher(
+    output_dir: Path, base_url: str, cache_dir: Path | None = None
+) -> Iterator[Callable[[str], None]]:
+    """Yield a callback that fetches a finished page's external images early.
+
+    The rewrite pass in download_external_images later finds these files
+    already in place; each URL is requested at most once across callers.
+    All calls share one download pool and per-host connection limit, which
+    is shut down when the context exits.
+    """
+    base_host = urlsplit(base_url).netloc
+    external_dir = output_dir / "external_assets"
+    requested: set[str] = set()
+    lock = threading.Lock()
+    host_slots: dict[str, threading.Semaphore] = {}
+
+    def _prefetch(url: str) -> None:
+        file_name = _saved_html_file(output_dir, url)
+        if file_name is None:
+            return
+        _pages, external_urls = _scan_external_images([file_name], base_host)
+        with lock:
+            new_urls = set(external_urls.values()) - requested
+            requested.update(new_urls)
+        if not new_urls:
+            return
+        try:
+            external_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        fetch_external_files(new_urls, external_dir, cache_dir, executor, host_slots)
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        yield _prefetch
+
+
+def download_external_images(
+    output_dir: Path,
+    base_url: str,
+    html_files: list[str],
+    cache_dir: Path | None = None,
+) -> list[str]:
+    """Download external img/src assets and rewrite HTML to local relative paths.
+
+    Returns the pages that still reference images which failed to download.
+    """
+    base_host = urlsplit(base_url).netloc
+    external_dir = output_dir / "external_assets"
+    external_dir.mkdir(parents=True, exist_ok=True)
+
+    # First pass: gather every external src so downloads can run concurrently.
+    pages, external_urls = _scan_external_images(html_files, base_host)
+    replacements = fetch_external_files(
+        set(external_urls.values()), external_dir, cache_dir
+    )
+
+    resolved = {
+        src: replacements[url].resolve()
+        for src, url in external_urls.items()
+        if url in replacements
+    }
+    incomplete: list[str] = []
+    finditer = IMG_PATTERN.finditer
+    for file_name in pages:
+        file_path = Path(file_name)
+        changed = False
+        missing = False
+        file_parent = file_path.parent.resolve()
+        relative_srcs: dict[bytes, bytes] = {}
+        rewritten = bytearray()
+        last = 0
+        try:
+            with _map_file(file_path) as data:
+                for match in finditer(data):
+                    src = match.group("src")
+                    dest_path = resolved.get(src)
+                    if dest_path is None:
+                        if src in external_urls:
+                            missing = True
+                        continue
+                    new_src = relative_srcs.get(src)
+                    if new_src is None:
+                        relative = os.path.relpath(dest_path, start=file_parent)
+                        new_src = relative.replace("\\", "/").encode("utf-8")
+                        relative_srcs[src] = new_src
+                    start, end = match.span("src")
+                    rewritten += data[last:start]
+                    rewritten += new_src
+                    last = end
+                    changed = True
+                if changed:
+                    rewritten += data[last:]
+        except (OSError, ValueError):
+            continue
+        if missing:
+            incomplete.append(file_name)
         if changed:
             try:
-                file_path.write_text(rewritten, encoding="utf-8")
+                file_path.write_bytes(rewritten)
             except OSError:
                 pass
+    return incomplete
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -290,6 +1256,34 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         help="Seed the temporary download directory from the existing output before mirroring.",
     )
     parser.set_defaults(clean=True)
+    parser.add_argument(
+        "--downloader",
+        choices=("wget", "aria2c", "auto"),
+        default="wget",
+        help=(
+            "Backend for the mirror download. aria2c fetches the URLs found by the "
+            "spider check in parallel; absolute, root-relative and relative site "
+            "links are then rewritten by post-processing instead of wget "
+            "--convert-links. auto uses aria2c when it is on PATH "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=DEFAULT_WGET_WORKERS,
+        help=(
+            "Number of parallel wget processes; the URLs found by the spider check "
+            "are split between them. 1 runs a single recursive wget --mirror "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--no-external-cache",
+        dest="external_cache",
+        action="store_false",
+        help="Always re-download external images instead of reusing the per-user cache.",
+    )
     parser.add_argument(
         "--spider",
         action="store_true",
@@ -298,41 +1292,25 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 
-def main(argv: list[str] | None = None) -> int:
-    args = parse_args(argv)
-    root = project_root()
-    try:
-        output_dir = resolve_output_dir(root, args.output_dir)
-        temp_dir = temp_output_dir(output_dir)
-        output_dir.parent.mkdir(parents=True, exist_ok=True)
-        temp_dir.parent.mkdir(parents=True, exist_ok=True)
-        wget_path = find_wget(root)
-    except (FileNotFoundError, ValueError) as exc:
-        print(exc, file=sys.stderr)
-        return 1
-
-    print(f"Using wget at: {wget_path}")
-    print(f"Output directory: {output_dir}")
-    print(f"Temporary directory: {temp_dir}")
-
-    # Spider-only mode remains available for manual checks.
-    if args.spider:
-        cleanup_directory(temp_dir)
-        spider_command = build_wget_command(wget_path, temp_dir, args.url, spider=True)
-        print("Running spider command:")
-        print(" ".join(spider_command))
-        spider_code = stream_process_output(spider_command)
-        cleanup_directory(temp_dir)
-        if spider_code != 0:
-            print(f"Spider check failed with code {spider_code}", file=sys.stderr)
-        return spider_code
-
+def run_mirror(
+    args: argparse.Namespace,
+    wget_path: Path,
+    aria2_path: Path | None,
+    output_dir: Path,
+    temp_dir: Path,
+    session_dir: Path,
+) -> int:
+    """Spider, download, post-process and promote the mirror."""
     # Pre-flight: spider the site before attempting a mirror.
     cleanup_directory(temp_dir)
-    spider_command = build_wget_command(wget_path, temp_dir, args.url, spider=True)
+    needs_urls = aria2_path is not None or args.workers > 1
+    spider_log = session_dir / "spider.log" if needs_urls else None
+    spider_command = build_wget_command(
+        wget_path, temp_dir, args.url, spider=True, session_dir=session_dir
+    )
     print("Running spider check before mirroring:")
     print(" ".join(spider_command))
-    spider_code = stream_process_output(spider_command)
+    spider_code = stream_process_output(spider_command, tee_log=spider_log)
     if spider_code != 0:
         print(
             "Skipping mirroring because spider check failed; keeping existing output.",
@@ -349,19 +1327,82 @@ def main(argv: list[str] | None = None) -> int:
         cleanup_directory(temp_dir)
         return 1
 
-    mirror_command = build_wget_command(wget_path, temp_dir, args.url, spider=False)
+    urls = spider_urls(spider_log, args.url) if spider_log else {}
+    if spider_log and not urls:
+        print("No URLs found in the spider log; running a single wget mirror.")
+
+    downloader = "wget"
+    if aria2_path and urls:
+        downloader = "aria2c"
+        input_file = session_dir / "aria2_urls.txt"
+        write_aria2_input(urls, input_file)
+        mirror_commands = [
+            build_aria2_command(aria2_path, temp_dir, input_file, session_dir)
+        ]
+    elif urls:
+        mirror_commands = []
+        for index, bucket in enumerate(partition_urls(urls, args.workers)):
+            if not bucket:
+                continue
+            input_file = session_dir / f"wget_urls_{index}.txt"
+            input_file.write_text("\n".join(bucket) + "\n", encoding="utf-8")
+            mirror_commands.append(
+                build_wget_worker_command(wget_path, temp_dir, input_file, session_dir)
+            )
+    else:
+        mirror_commands = [
+            build_wget_command(
+                wget_path, temp_dir, args.url, spider=False, session_dir=session_dir
+            )
+        ]
     print("Running mirror command:")
-    print(" ".join(mirror_command))
+    for mirror_command in mirror_commands:
+        print(" ".join(mirror_command))
+
+    cache_dir = None
+    if args.external_cache:
+        cache_dir = external_cache_dir()
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            print(f"External image cache disabled: {exc}", file=sys.stderr)
+            cache_dir = None
 
-    return_code = stream_process_output(mirror_command)
+    if len(mirror_commands) == 1:
+        return_code = stream_process_output(mirror_commands[0])
+    else:
+        # Fetch external images of finished pages while the workers run.
+        with external_image_prefetcher(temp_dir, args.url, cache_dir) as prefetch:
+            return_code = stream_process_outputs(mirror_commands, on_finished=prefetch)
     if return_code != 0:
-        print(f"wget exited with code {return_code}", file=sys.stderr)
+        print(f"{downloader} exited with code {return_code}", file=sys.stderr)
         cleanup_directory(temp_dir)
         return return_code
 
     # Post-process links to ensure assets point to local copies for offline deploy.
-    rewrite_links_to_local(temp_dir, args.url)
-    download_external_images(temp_dir, args.url)
+    # On --no-clean runs, files unchanged since the previous run's
+    # post-processing are skipped; --clean runs start from scratch.
+    rewrite_files, html_files = _collect_files(temp_dir)
+    manifest_path = rewrite_manifest_path(output_dir)
+    manifest = {} if args.clean else load_rewrite_manifest(manifest_path)
+    changed_files = filter_changed_files(temp_dir, rewrite_files, manifest)
+    changed_set = set(changed_files)
+    page_urls: dict[str, str] | None = None
+    if downloader == "aria2c":
+        # aria2c saved pages as served; their relative links need rewriting too.
+        page_urls = {}
+        for url, content_type in urls.items():
+            relative = local_path_for_url(url, content_type)
+            page_urls[os.path.join(temp_dir, *relative.split("/"))] = url
+    rewrite_links_to_local(temp_dir, args.url, changed_files, page_urls)
+    incomplete = download_external_images(
+        temp_dir, args.url, [p for p in html_files if p in changed_set], cache_dir
+    )
+    if not args.clean:
+        # Stat the files now; they are written out once the tree is in place.
+        manifest = build_rewrite_manifest(
+            temp_dir, rewrite_files, manifest, exclude=incomplete
+        )
 
     try:
         replace_directory(temp_dir, output_dir)
@@ -370,8 +1411,65 @@ def main(argv: list[str] | None = None) -> int:
         cleanup_directory(temp_dir)
         return 1
 
+    if args.clean:
+        # A manifest from an earlier --no-clean run describes the old tree.
+        try:
+            manifest_path.unlink()
+        except OSError:
+            pass
+    else:
+        write_rewrite_manifest(manifest_path, manifest)
+
     return return_code
 
 
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    root = project_root()
+    try:
+        output_dir = resolve_output_dir(root, args.output_dir)
+        temp_dir = temp_output_dir(output_dir)
+        output_dir.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir.parent.mkdir(parents=True, exist_ok=True)
+        wget_path = find_wget(root)
+        wget_release = wget_version(wget_path)
+        aria2_path: Path | None = None
+        if args.downloader == "aria2c" or (
+            args.downloader == "auto" and shutil.which("aria2c")
+        ):
+            aria2_path = find_aria2c()
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+    print(f"Using wget at: {wget_path} ({wget_release})")
+    if aria2_path:
+        print(f"Using aria2c at: {aria2_path}")
+    print(f"Output directory: {output_dir}")
+    print(f"Temporary directory: {temp_dir}")
+
+    # Spider-only mode remains available for manual checks.
+    if args.spider:
+        cleanup_directory(temp_dir)
+        spider_command = build_wget_command(wget_path, temp_dir, args.url, spider=True)
+        print("Running spider command:")
+        print(" ".join(spider_command))
+        spider_code = stream_process_output(spider_command)
+        cleanup_directory(temp_dir)
+        if spider_code != 0:
+            print(f"Spider check failed with code {spider_code}", file=sys.stderr)
+        return spider_code
+
+    session_dir = session_directory(temp_dir)
+    cleanup_directory(session_dir)
+    session_dir.mkdir(parents=True)
+    try:
+        return run_mirror(
+            args, wget_path, aria2_path, output_dir, temp_dir, session_dir
+        )
+    finally:
+        cleanup_directory(session_dir)
+
+
 if __name__ == "__main__":
     sys.exit(main())